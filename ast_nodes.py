@@ -3,129 +3,274 @@ AST Node Classes for Arabic Programming Language Compiler
 Defines the structure of the Abstract Syntax Tree
 """
 
+import os
+import sys
+import weakref
+
+# Operator strings, interned once so every BinaryOp/UnaryOp shares them and
+# operator-keyed lookups compare by identity
+OP_ADD = sys.intern('+')
+OP_SUB = sys.intern('-')
+OP_MUL = sys.intern('*')
+OP_DIV = sys.intern('/')
+OP_EQ = sys.intern('==')
+OP_NE = sys.intern('!=')
+OP_GT = sys.intern('>')
+OP_LT = sys.intern('<')
+OP_GE = sys.intern('>=')
+OP_LE = sys.intern('<=')
+
 class ASTNode:
     """Base class for all AST nodes"""
-    pass
+    __slots__ = ('__weakref__',)
+    
+    # Attributes holding a single child node (possibly None) and attributes
+    # holding a list of child nodes; everything else is a plain value
+    _child_fields = ()
+    _child_list_fields = ()
+    
+    # The same fields last-first, the order walk() pushes children in
+    _reversed_child_fields = ()
+    _reversed_child_list_fields = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._reversed_child_fields = cls._child_fields[::-1]
+        cls._reversed_child_list_fields = cls._child_list_fields[::-1]
+    
+    # Full recursive reprs get huge on large trees (and an error message
+    # that formats a node would render all of them), so by default a node
+    # only shows its own plain values. Set ARC_DEBUG, or flip this flag,
+    # to get the full form.
+    debug_repr = bool(os.environ.get('ARC_DEBUG'))
+    
+    def __repr__(self):
+        if ASTNode.debug_repr:
+            return self._full_repr()
+        return self._short_repr()
+    
+    def _short_repr(self):
+        """Class name plus the non-node attributes"""
+        children = self._child_fields + self._child_list_fields
+        values = [str(getattr(self, field)) for field in type(self).__slots__
+                  if field not in children]
+        return f"{type(self).__name__}({', '.join(values)})"
 
 class Program(ASTNode):
     """Root node containing all functions"""
+    __slots__ = ('functions',)
+    _child_list_fields = ('functions',)
+    
     def __init__(self, functions):
         self.functions = functions
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"Program({self.functions})"
 
 class Function(ASTNode):
     """Function definition node"""
+    __slots__ = ('name', 'params', 'body')
+    _child_fields = ('body',)
+    
     def __init__(self, name, params, body):
         self.name = name
         self.params = params  # List of parameter names
         self.body = body  # Block node
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"Function({self.name}, {self.params}, {self.body})"
 
 class Block(ASTNode):
     """Block of statements"""
+    __slots__ = ('statements',)
+    _child_list_fields = ('statements',)
+    
     def __init__(self, statements):
         self.statements = statements
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"Block({self.statements})"
 
 class VarDecl(ASTNode):
     """Variable declaration: متغير x = 5;"""
+    __slots__ = ('name', 'value')
+    _child_fields = ('value',)
+    
     def __init__(self, name, value):
         self.name = name
         self.value = value  # Expression node
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"VarDecl({self.name}, {self.value})"
 
 class Assignment(ASTNode):
     """Variable assignment: x = 10;"""
+    __slots__ = ('name', 'value')
+    _child_fields = ('value',)
+    
     def __init__(self, name, value):
         self.name = name
         self.value = value  # Expression node
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"Assignment({self.name}, {self.value})"
 
 class IfStatement(ASTNode):
     """If statement with optional else"""
+    __slots__ = ('condition', 'then_block', 'else_block')
+    _child_fields = ('condition', 'then_block', 'else_block')
+    
     def __init__(self, condition, then_block, else_block=None):
         self.condition = condition
         self.then_block = then_block
         self.else_block = else_block
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"IfStatement({self.condition}, {self.then_block}, {self.else_block})"
 
 class WhileStatement(ASTNode):
     """While loop"""
+    __slots__ = ('condition', 'body')
+    _child_fields = ('condition', 'body')
+    
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"WhileStatement({self.condition}, {self.body})"
 
 class ReturnStatement(ASTNode):
     """Return statement"""
+    __slots__ = ('value',)
+    _child_fields = ('value',)
+    
     def __init__(self, value):
         self.value = value  # Expression node
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"ReturnStatement({self.value})"
 
 class PrintStatement(ASTNode):
     """Print statement: اطبع(x);"""
+    __slots__ = ('value',)
+    _child_fields = ('value',)
+    
     def __init__(self, value):
         self.value = value  # Expression node
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"PrintStatement({self.value})"
 
 class BinaryOp(ASTNode):
     """Binary operation: left op right"""
+    __slots__ = ('left', 'op', 'right')
+    _child_fields = ('left', 'right')
+    
     def __init__(self, left, op, right):
         self.left = left
         self.op = op  # '+', '-', '*', '/', '==', '!=', '>', '<', '>=', '<='
         self.right = right
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"BinaryOp({self.left}, {self.op}, {self.right})"
 
 class UnaryOp(ASTNode):
     """Unary operation: op value"""
+    __slots__ = ('op', 'value')
+    _child_fields = ('value',)
+    
     def __init__(self, op, value):
         self.op = op  # '-', '!'
         self.value = value
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"UnaryOp({self.op}, {self.value})"
 
 class Number(ASTNode):
     """Numeric literal"""
+    __slots__ = ('value',)
+    
     def __init__(self, value):
         self.value = int(value)
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"Number({self.value})"
 
 class Identifier(ASTNode):
     """Variable or function reference"""
+    __slots__ = ('name',)
+    
     def __init__(self, name):
         self.name = name
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"Identifier({self.name})"
 
 class FunctionCall(ASTNode):
     """Function call"""
+    __slots__ = ('name', 'args')
+    _child_list_fields = ('args',)
+    
     def __init__(self, name, args):
         self.name = name
         self.args = args  # List of expression nodes
     
-    def __repr__(self):
+    def _full_repr(self):
         return f"FunctionCall({self.name}, {self.args})"
+
+def iter_children(node):
+    """Yield the direct child nodes of node, in source order"""
+    for field in node._child_fields:
+        child = getattr(node, field)
+        if child is not None:
+            yield child
+    for field in node._child_list_fields:
+        yield from getattr(node, field)
+
+def walk(node):
+    """Yield node and all its descendants, in source order"""
+    stack = [node]
+    pop = stack.pop
+    push = stack.append
+    extend = stack.extend
+    while stack:
+        node = pop()
+        yield node
+        # Push children last-first so they pop in source order; list
+        # fields come after single-child fields in iter_children order
+        for field in node._reversed_child_list_fields:
+            extend(reversed(getattr(node, field)))
+        for field in node._reversed_child_fields:
+            child = getattr(node, field)
+            if child is not None:
+                push(child)
+
+# root node -> {class: nodes found}; entries vanish with the tree
+_find_all_cache = weakref.WeakKeyDictionary()
+
+def find_all(root, cls):
+    """Return a tuple of every node of type cls in the tree under root
+    (root included), in source order. Results are cached per root, so the
+    tree must not be modified afterwards. The cache only pays off when the
+    same root is queried again; a pass that asks once per tree pays for
+    the full walk every time."""
+    by_class = _find_all_cache.get(root)
+    if by_class is None:
+        by_class = _find_all_cache[root] = {}
+    found = by_class.get(cls)
+    if found is None:
+        found = by_class[cls] = tuple(n for n in walk(root) if isinstance(n, cls))
+    return found
+
+def pretty(node):
+    """Format the tree under node one node per line, children indented"""
+    lines = []
+    stack = [(node, 0)]
+    while stack:
+        node, depth = stack.pop()
+        lines.append("  " * depth + node._short_repr())
+        children = list(iter_children(node))
+        children.reverse()
+        stack.extend((child, depth + 1) for child in children)
+    return "\n".join(lines)
@@ -3,8 +3,161 @@ Code Generator for Arabic Programming Language
 Generates x86-64 assembly code (Intel syntax) for Linux
 """
 
+import operator
+
 from ast_nodes import *
 
+# System V argument registers, in parameter order
+PARAM_REGISTERS = ('rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9')
+
+# Argument registers that evaluating a call-free expression may clobber:
+# rdx through cqo/idiv, rcx as a scratch register
+VOLATILE_PARAM_REGISTERS = frozenset(('rdx', 'rcx'))
+
+# Parameters are always the first locals of a frame, so the instructions
+# that spill them from their registers are fixed
+PARAM_STORES = tuple(f"    mov [rbp-{8 * (i + 1)}], {reg}"
+                     for i, reg in enumerate(PARAM_REGISTERS))
+
+# Runtime routine printing the integer in rdi, digit by digit
+PRINT_HELPER = """
+print_number:
+    push rbp
+    mov rbp, rsp
+    sub rsp, 32
+    
+    mov rax, rdi
+    mov rcx, 10
+    lea rsi, [rbp-32]
+    mov BYTE PTR [rsi], 10
+    inc rsi
+    
+    test rax, rax
+    jns .convert_digits
+    neg rax
+    push rax
+    mov rax, 45
+    mov BYTE PTR [rsi], al
+    inc rsi
+    pop rax
+    
+.convert_digits:
+    test rax, rax
+    jnz .digit_loop
+    mov BYTE PTR [rsi], 48
+    inc rsi
+    jmp .print_loop
+    
+.digit_loop:
+    test rax, rax
+    jz .print_loop
+    xor rdx, rdx
+    div rcx
+    add dl, 48
+    mov BYTE PTR [rsi], dl
+    inc rsi
+    jmp .digit_loop
+    
+.print_loop:
+    dec rsi
+    cmp BYTE PTR [rsi], 10
+    je .end_print
+    
+    mov rax, 1
+    mov rdi, 1
+    mov rdx, 1
+    syscall
+    jmp .print_loop
+    
+.end_print:
+    mov rsp, rbp
+    pop rbp
+    ret
+"""
+
+# Fixed pieces of output, each emitted as a single entry
+ASM_HEADER = """\
+.intel_syntax noprefix
+
+.section .data
+fmt_int: .asciz "%d\\n"
+.section .text
+.global _start"""
+
+# Entry point that calls رئيسية (main) and exits with its result
+START_STUB = """
+_start:
+    call رئيسية
+    mov rdi, rax
+    mov rax, 60
+    syscall"""
+
+PROLOGUE = """\
+    push rbp
+    mov rbp, rsp"""
+
+EPILOGUE = """\
+    mov rsp, rbp
+    pop rbp
+    ret"""
+
+PRINT_INT = """\
+    # Print integer in rax
+    mov rdi, rax
+    call print_number"""
+
+def _wrap64(value):
+    """Wrap an int to a signed 64-bit value, as the CPU would"""
+    return (value + 2**63) % 2**64 - 2**63
+
+def _idiv(a, b):
+    """Integer division truncating toward zero, matching idiv"""
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+# Operators evaluated at compile time when both operands are literals
+FOLD_OPS = {
+    OP_ADD: operator.add,
+    OP_SUB: operator.sub,
+    OP_MUL: operator.mul,
+    OP_DIV: _idiv,
+    OP_EQ: operator.eq,
+    OP_NE: operator.ne,
+    OP_GT: operator.gt,
+    OP_LT: operator.lt,
+    OP_GE: operator.ge,
+    OP_LE: operator.le,
+}
+
+# Operator to use when a binary operation's operands are exchanged
+SWAPPED_OPS = {
+    OP_ADD: OP_ADD,
+    OP_MUL: OP_MUL,
+    OP_EQ: OP_EQ,
+    OP_NE: OP_NE,
+    OP_GT: OP_LT,
+    OP_LT: OP_GT,
+    OP_GE: OP_LE,
+    OP_LE: OP_GE,
+}
+
+# Branch taken when a comparison is false
+JUMP_IF_FALSE = {
+    OP_EQ: "jne",
+    OP_NE: "je",
+    OP_GT: "jle",
+    OP_LT: "jge",
+    OP_GE: "jl",
+    OP_LE: "jg",
+}
+
+# Range of literals usable as sign-extended 32-bit instruction immediates
+IMM32_MIN = -2**31
+IMM32_MAX = 2**31 - 1
+
+# Registers free to hold the right operand of a binary operation
+SCRATCH_REGISTERS = ('rbx', 'rcx', 'r10', 'r11', 'r12', 'r13')
+
 class CodeGenerator:
     def __init__(self):
         self.output = []
@@ -12,12 +165,52 @@ class CodeGenerator:
         self.string_counter = 0
         self.data_section = []
         self.current_function = None
-        self.local_vars = {}  # Maps variable name to stack offset
+        self.local_vars = {}  # Maps variable name to (stack offset, operand)
         self.stack_offset = 0
+        # Scratch registers not currently holding an operand (popped from
+        # the end, so rbx is handed out first)
+        self.free_regs = list(reversed(SCRATCH_REGISTERS))
+        # False right after jmp/ret, until the next label
+        self._reachable = True
+        # (operand, output length) of the last store of rax to a variable,
+        # so reading it back straight away can be skipped
+        self._last_store = None
+        
+        # Dispatch tables: one dict lookup on the node type instead of an
+        # isinstance chain per node visited
+        self._stmt_dispatch = {
+            VarDecl: self._emit_vardecl,
+            Assignment: self._emit_assign,
+            IfStatement: self._emit_if,
+            WhileStatement: self._emit_while,
+            ReturnStatement: self._emit_return,
+            PrintStatement: self._emit_print,
+            FunctionCall: self._emit_call_stmt,
+        }
+        self._expr_dispatch = {
+            Number: self._emit_number,
+            Identifier: self._emit_identifier,
+            BinaryOp: self._emit_binop,
+            UnaryOp: self._emit_unaryop,
+            FunctionCall: self.generate_function_call,
+        }
+        self._binop_dispatch = {
+            OP_ADD: self._emit_add,
+            OP_SUB: self._emit_sub,
+            OP_MUL: self._emit_mul,
+            OP_DIV: self._emit_div,
+            OP_EQ: self._emit_compare("sete"),
+            OP_NE: self._emit_compare("setne"),
+            OP_GT: self._emit_compare("setg"),
+            OP_LT: self._emit_compare("setl"),
+            OP_GE: self._emit_compare("setge"),
+            OP_LE: self._emit_compare("setle"),
+        }
+        self._cmp_dispatch = dict.fromkeys(JUMP_IF_FALSE, self._emit_cmp)
     
     def new_label(self, prefix="L"):
         """Generate a unique label"""
-        label = f"{prefix}{self.label_counter}"
+        label = prefix + str(self.label_counter)
         self.label_counter += 1
         return label
     
@@ -25,32 +218,37 @@ class CodeGenerator:
         """Emit assembly code"""
         self.output.append(code)
     
+    def emit_label(self, label):
+        """Emit a label; a jump straight to it is dropped as a no-op"""
+        if self.output[-1] == "    jmp " + label:
+            self.output.pop()
+        self.output.append(label + ":")
+        self._reachable = True
+    
+    def emit_jump(self, label):
+        """Emit an unconditional jump, unless the code is unreachable"""
+        if self._reachable:
+            self.output.append("    jmp " + label)
+            self._reachable = False
+    
+    def emit_block(self, block, falls_through=True):
+        """Emit a prebuilt run of instructions (no labels) as one entry;
+        in dead code it is dropped as a whole"""
+        if not self._reachable:
+            return
+        self.output.append(block)
+        self._reachable = falls_through
+    
     def generate(self, program):
         """Generate assembly for entire program"""
-        # Enable Intel syntax for GNU assembler
-        self.emit(".intel_syntax noprefix")
-        self.emit("")
-        
-        # Generate data section
-        self.emit(".section .data")
-        self.emit("fmt_int: .asciz \"%d\\n\"")
-        
-        # Generate code section
-        self.emit(".section .text")
-        self.emit(".global _start")
+        # Intel syntax, data section and code section preamble
+        self.output.append(ASM_HEADER)
         
         # Generate each function
         for func in program.functions:
             self.generate_function(func)
         
-        # Generate _start entry point that calls رئيسية (main)
-        self.emit("")
-        self.emit("_start:")
-        self.emit("    call رئيسية")
-        self.emit("    mov rdi, rax")
-        self.emit("    mov rax, 60")
-        self.emit("    syscall")
-        
+        self.output.append(START_STUB)
         return "\n".join(self.output)
     
     def generate_function(self, func):
@@ -60,252 +258,410 @@ class CodeGenerator:
         self.stack_offset = 0
         
         self.emit("")
-        self.emit(f"{func.name}:")
-        self.emit("    push rbp")
-        self.emit("    mov rbp, rsp")
+        self.emit_label(func.name)
+        self.emit_block(PROLOGUE)
         
-        # Reserve space for local variables (we'll fix this later)
-        # For now, reserve 256 bytes
-        self.emit("    sub rsp, 256")
+        # Reserve space for parameters and local variables
+        frame_size = self.frame_size(func)
+        if frame_size:
+            self.emit(f"    sub rsp, {frame_size}")
         
         # Store parameters on stack
-        param_registers = ['rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9']
-        for i, param in enumerate(func.params):
-            if i < len(param_registers):
-                offset = self.allocate_local(param)
-                self.emit(f"    mov [rbp{offset}], {param_registers[i]}")
+        for param, store in zip(func.params, PARAM_STORES):
+            self.allocate_local(param)
+            self.emit(store)
         
         # Generate function body
         self.generate_block(func.body)
         
         # Function epilogue (in case no return statement)
-        self.emit("    mov rsp, rbp")
-        self.emit("    pop rbp")
-        self.emit("    ret")
+        self.emit_block(EPILOGUE, falls_through=False)
+    
+    def frame_size(self, func):
+        """Bytes of stack needed for a function's locals, 16-byte aligned"""
+        slots = min(len(func.params), len(PARAM_STORES)) + len(self._local_decls(func.body.statements))
+        return (slots * 8 + 15) & ~15
+    
+    def _local_decls(self, statements):
+        """List the VarDecls in statements and in the blocks nested in
+        them, in source order; expressions cannot declare variables, so
+        they are never entered"""
+        decls = []
+        stack = statements[::-1]
+        while stack:
+            stmt = stack.pop()
+            kind = type(stmt)
+            if kind is VarDecl:
+                decls.append(stmt)
+            elif kind is IfStatement:
+                if stmt.else_block:
+                    stack.append(stmt.else_block)
+                stack.append(stmt.then_block)
+            elif kind is WhileStatement:
+                stack.append(stmt.body)
+            elif kind is Block:
+                stack.extend(reversed(stmt.statements))
+        return decls
     
     def allocate_local(self, name):
-        """Allocate space for a local variable on stack"""
+        """Allocate space for a local variable on stack, return its operand"""
         self.stack_offset -= 8
-        self.local_vars[name] = self.stack_offset
-        return self.stack_offset
+        location = f"[rbp{self.stack_offset}]"
+        self.local_vars[name] = (self.stack_offset, location)
+        return location
     
     def get_var_location(self, name):
         """Get stack location of variable"""
-        if name in self.local_vars:
-            return f"[rbp{self.local_vars[name]}]"
-        else:
-            raise NameError(f"Variable '{name}' not found")
+        try:
+            return self.local_vars[name][1]
+        except KeyError:
+            raise NameError(f"Variable '{name}' not found") from None
     
     def generate_block(self, block):
         """Generate code for a block"""
-        for stmt in block.statements:
+        statements = block.statements
+        for i, stmt in enumerate(statements):
+            if not self._reachable:
+                # Everything after a return is dead; its variables still
+                # need slots for references further down the function
+                for decl in self._local_decls(statements[i:]):
+                    self.allocate_local(decl.name)
+                break
             self.generate_statement(stmt)
     
     def generate_statement(self, stmt):
         """Generate code for a statement"""
-        if isinstance(stmt, VarDecl):
-            # Allocate space and evaluate initial value
-            offset = self.allocate_local(stmt.name)
-            self.generate_expression(stmt.value)
-            self.emit(f"    mov [rbp{offset}], rax")
-        
-        elif isinstance(stmt, Assignment):
-            self.generate_expression(stmt.value)
-            location = self.get_var_location(stmt.name)
-            self.emit(f"    mov {location}, rax")
-        
-        elif isinstance(stmt, IfStatement):
-            else_label = self.new_label("else")
-            end_label = self.new_label("endif")
-            
-            # Evaluate condition
-            self.generate_expression(stmt.condition)
-            self.emit("    cmp rax, 0")
-            self.emit(f"    je {else_label}")
-            
-            # Then block
-            self.generate_block(stmt.then_block)
-            self.emit(f"    jmp {end_label}")
-            
-            # Else block
-            self.emit(f"{else_label}:")
-            if stmt.else_block:
-                self.generate_block(stmt.else_block)
-            
-            self.emit(f"{end_label}:")
+        handler = self._stmt_dispatch.get(type(stmt))
+        if handler:
+            handler(stmt)
+    
+    def _emit_vardecl(self, stmt):
+        # Allocate space and evaluate initial value
+        location = self.allocate_local(stmt.name)
+        self.generate_expression(stmt.value)
+        self.emit("    mov " + location + ", rax")
+        self._last_store = (location, len(self.output))
+    
+    def _emit_assign(self, stmt):
+        self.generate_expression(stmt.value)
+        location = self.get_var_location(stmt.name)
+        self.emit("    mov " + location + ", rax")
+        self._last_store = (location, len(self.output))
+    
+    def _emit_if(self, stmt):
+        condition = self._fold(stmt.condition)
+        if type(condition) is Number:
+            # Constant condition: only the taken branch is emitted
+            if condition.value:
+                taken, dead = stmt.then_block, stmt.else_block
+            else:
+                taken, dead = stmt.else_block, stmt.then_block
+            if dead:
+                self._declare_locals(dead)
+            if taken:
+                self.generate_block(taken)
+            return
         
-        elif isinstance(stmt, WhileStatement):
-            start_label = self.new_label("while_start")
-            end_label = self.new_label("while_end")
-            
-            self.emit(f"{start_label}:")
-            self.generate_expression(stmt.condition)
+        else_label = self.new_label("else")
+        end_label = self.new_label("endif")
+        
+        # Evaluate condition
+        self._branch_if_false(condition, else_label)
+        
+        # Then block
+        self.generate_block(stmt.then_block)
+        self.emit_jump(end_label)
+        
+        # Else block
+        self.emit_label(else_label)
+        if stmt.else_block:
+            self.generate_block(stmt.else_block)
+        
+        self.emit_label(end_label)
+    
+    def _emit_while(self, stmt):
+        condition = self._fold(stmt.condition)
+        if type(condition) is Number and not condition.value:
+            # Loop never runs
+            self._declare_locals(stmt.body)
+            return
+        
+        start_label = self.new_label("while_start")
+        end_label = self.new_label("while_end")
+        
+        self.emit_label(start_label)
+        if type(condition) is not Number:
+            self._branch_if_false(condition, end_label)
+        
+        self.generate_block(stmt.body)
+        self.emit_jump(start_label)
+        
+        self.emit_label(end_label)
+    
+    def _branch_if_false(self, condition, label):
+        """Jump to label when a folded condition evaluates to zero"""
+        if type(condition) is BinaryOp and condition.op in JUMP_IF_FALSE:
+            # Branch on the comparison flags instead of materializing 0/1
+            op = self._emit_binop(condition, self._cmp_dispatch)
+            self.emit(f"    {JUMP_IF_FALSE[op]} " + label)
+        else:
+            self._expr_dispatch[type(condition)](condition)
             self.emit("    cmp rax, 0")
-            self.emit(f"    je {end_label}")
+            self.emit("    je " + label)
+    
+    def _declare_locals(self, block):
+        """Allocate stack slots for variables declared in a block that is
+        never emitted, so later references still resolve"""
+        for decl in self._local_decls(block.statements):
+            self.allocate_local(decl.name)
+    
+    def _emit_return(self, stmt):
+        self.generate_expression(stmt.value)
+        self.emit_block(EPILOGUE, falls_through=False)
+    
+    def _emit_print(self, stmt):
+        # Evaluate expression and print using syscall
+        self.generate_expression(stmt.value)
+        self.generate_print_int()
+    
+    def _emit_call_stmt(self, stmt):
+        self.generate_function_call(self._fold(stmt))
+    
+    def generate_expression(self, expr):
+        """Generate code for expression, result in rax"""
+        # Emitters recurse on operands through _expr_dispatch directly,
+        # so each nesting level costs a single Python frame
+        expr = self._fold(expr)
+        self._expr_dispatch[type(expr)](expr)
+    
+    def _fold(self, expr):
+        """Return expr with operations on integer literals evaluated and
+        trivial identities (x + 0, x * 1, ...) removed"""
+        kind = type(expr)
+        
+        if kind is BinaryOp:
+            left = self._fold(expr.left)
+            right = self._fold(expr.right)
+            op = expr.op
+            left_const = type(left) is Number
+            right_const = type(right) is Number
             
-            self.generate_block(stmt.body)
-            self.emit(f"    jmp {start_label}")
+            if left_const and right_const:
+                if not (op == OP_DIV and right.value == 0):
+                    return Number(_wrap64(int(FOLD_OPS[op](left.value, right.value))))
+            elif right_const:
+                if (op in (OP_ADD, OP_SUB) and right.value == 0) or \
+                   (op in (OP_MUL, OP_DIV) and right.value == 1):
+                    return left
+            elif left_const:
+                if (op == OP_ADD and left.value == 0) or (op == OP_MUL and left.value == 1):
+                    return right
             
-            self.emit(f"{end_label}:")
+            if left is expr.left and right is expr.right:
+                return expr
+            return BinaryOp(left, op, right)
         
-        elif isinstance(stmt, ReturnStatement):
-            self.generate_expression(stmt.value)
-            self.emit("    mov rsp, rbp")
-            self.emit("    pop rbp")
-            self.emit("    ret")
+        if kind is UnaryOp:
+            value = self._fold(expr.value)
+            if expr.op == OP_SUB and type(value) is Number:
+                return Number(_wrap64(-value.value))
+            if value is expr.value:
+                return expr
+            return UnaryOp(expr.op, value)
         
-        elif isinstance(stmt, PrintStatement):
-            # Evaluate expression and print using syscall
-            self.generate_expression(stmt.value)
-            self.generate_print_int()
+        if kind is FunctionCall:
+            args = [self._fold(arg) for arg in expr.args]
+            if all(new is old for new, old in zip(args, expr.args)):
+                return expr
+            return FunctionCall(expr.name, args)
         
-        elif isinstance(stmt, FunctionCall):
-            self.generate_function_call(stmt)
+        return expr
     
-    def generate_expression(self, expr):
-        """Generate code for expression, result in rax"""
-        if isinstance(expr, Number):
-            self.emit(f"    mov rax, {expr.value}")
+    def _emit_number(self, expr):
+        self.emit(f"    mov rax, {expr.value}")
+    
+    def _emit_identifier(self, expr):
+        location = self.get_var_location(expr.name)
+        if self._last_store == (location, len(self.output)):
+            return  # rax still holds the value just stored there
+        self.emit("    mov rax, " + location)
+    
+    def _emit_binop(self, expr, handlers=None):
+        """Evaluate expr into rax, applying its operator through handlers
+        (the arithmetic/0-1 emitters by default); returns the operator
+        actually applied, which is mirrored if the operands were exchanged.
+        
+        Operands are evaluated through _expr_dispatch directly, so each
+        level of a nested expression costs a single Python frame."""
+        dispatch = self._expr_dispatch
+        left, op, right = expr.left, expr.op, expr.right
+        
+        # Move a literal left operand to the right where it can become an
+        # immediate; literals have no side effects, so order is preserved
+        if type(left) is Number and type(right) is not Number and op in SWAPPED_OPS:
+            left, op, right = right, SWAPPED_OPS[op], left
+        
+        handler = (handlers or self._binop_dispatch).get(op)
+        operand = self._direct_operand(op, right)
+        
+        if operand is not None:
+            dispatch[type(left)](left)
+            if handler:
+                handler(operand)
+        
+        elif self.free_regs and type(right) is Number:
+            # Divisor or wide literal: load it into a scratch register
+            dispatch[type(left)](left)
+            reg = self.free_regs.pop()
+            self.emit(f"    mov {reg}, {right.value}")
+            if handler:
+                handler(reg)
+            self.free_regs.append(reg)
         
-        elif isinstance(expr, Identifier):
-            location = self.get_var_location(expr.name)
-            self.emit(f"    mov rax, {location}")
+        elif self.free_regs and not self._contains_call(left):
+            # Evaluate right side first and keep it in a scratch register;
+            # safe because nothing on the left can clobber it
+            dispatch[type(right)](right)
+            reg = self.free_regs.pop()
+            self.emit(f"    mov {reg}, rax")
+            dispatch[type(left)](left)
+            if handler:
+                handler(reg)
+            self.free_regs.append(reg)
         
-        elif isinstance(expr, BinaryOp):
-            # Evaluate right side first, push to stack
-            self.generate_expression(expr.right)
+        else:
+            # Spill right side to the stack across the left side
+            dispatch[type(right)](right)
             self.emit("    push rax")
-            
-            # Evaluate left side
-            self.generate_expression(expr.left)
-            
-            # Pop right side to rbx
-            self.emit("    pop rbx")
-            
-            # Perform operation
-            if expr.op == '+':
-                self.emit("    add rax, rbx")
-            elif expr.op == '-':
-                self.emit("    sub rax, rbx")
-            elif expr.op == '*':
-                self.emit("    imul rax, rbx")
-            elif expr.op == '/':
-                self.emit("    cqo")
-                self.emit("    idiv rbx")
-            elif expr.op == '==':
-                self.emit("    cmp rax, rbx")
-                self.emit("    sete al")
-                self.emit("    movzx rax, al")
-            elif expr.op == '!=':
-                self.emit("    cmp rax, rbx")
-                self.emit("    setne al")
-                self.emit("    movzx rax, al")
-            elif expr.op == '>':
-                self.emit("    cmp rax, rbx")
-                self.emit("    setg al")
-                self.emit("    movzx rax, al")
-            elif expr.op == '<':
-                self.emit("    cmp rax, rbx")
-                self.emit("    setl al")
-                self.emit("    movzx rax, al")
-            elif expr.op == '>=':
-                self.emit("    cmp rax, rbx")
-                self.emit("    setge al")
-                self.emit("    movzx rax, al")
-            elif expr.op == '<=':
-                self.emit("    cmp rax, rbx")
-                self.emit("    setle al")
-                self.emit("    movzx rax, al")
-        
-        elif isinstance(expr, UnaryOp):
-            self.generate_expression(expr.value)
-            if expr.op == '-':
-                self.emit("    neg rax")
-        
-        elif isinstance(expr, FunctionCall):
-            self.generate_function_call(expr)
+            dispatch[type(left)](left)
+            if self.free_regs:
+                reg = self.free_regs[-1]
+                self.emit("    pop " + reg)
+                if handler:
+                    handler(reg)
+            else:
+                if handler:
+                    handler("QWORD PTR [rsp]")
+                # lea leaves the flags alone for a following branch
+                self.emit("    lea rsp, [rsp+8]")
+        
+        return op
+    
+    def _direct_operand(self, op, right):
+        """The instruction operand for a right side usable as is, or None
+        if it must be evaluated or loaded into a register first"""
+        if type(right) is Identifier:
+            # Variable right side is used straight from its stack slot
+            return self.get_var_location(right.name)
+        if type(right) is Number and op != OP_DIV and IMM32_MIN <= right.value <= IMM32_MAX:
+            # Literal right side fits in an instruction immediate
+            return str(right.value)
+        return None
+    
+    def _contains_call(self, expr):
+        """Check whether evaluating expr may call a function"""
+        kind = type(expr)
+        if kind is FunctionCall:
+            return True
+        if kind is BinaryOp:
+            return self._contains_call(expr.left) or self._contains_call(expr.right)
+        if kind is UnaryOp:
+            return self._contains_call(expr.value)
+        return False
+    
+    def _emit_add(self, operand):
+        self.emit("    add rax, " + operand)
+    
+    def _emit_sub(self, operand):
+        self.emit("    sub rax, " + operand)
+    
+    def _emit_mul(self, operand):
+        self.emit("    imul rax, " + operand)
+    
+    def _emit_div(self, operand):
+        if operand[0] == '[':
+            # Stack slot: idiv has no other operand to infer the size from
+            operand = "QWORD PTR " + operand
+        self.emit("    cqo")
+        self.emit("    idiv " + operand)
+    
+    def _emit_compare(self, setcc):
+        """Return an emitter comparing rax with an operand, leaving 0/1 in rax"""
+        def emit_compare(operand):
+            self.emit("    cmp rax, " + operand)
+            self.emit(f"    {setcc} al")
+            self.emit("    movzx rax, al")
+        return emit_compare
+    
+    def _emit_cmp(self, operand):
+        self.emit("    cmp rax, " + operand)
+    
+    def _emit_unaryop(self, expr):
+        self._expr_dispatch[type(expr.value)](expr.value)
+        if expr.op == OP_SUB:
+            self.emit("    neg rax")
     
     def generate_function_call(self, call):
         """Generate function call"""
-        # Evaluate arguments and pass in registers
-        param_registers = ['rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9']
+        args = call.args
+        if len(args) > len(PARAM_REGISTERS):
+            self._generate_stacked_call(call)
+            return
+        
+        # Evaluate arguments and pass in registers. Literals and variables
+        # are loaded last, straight into their registers; other arguments
+        # are evaluated right to left (the original evaluation order)
+        computed = [i for i, arg in enumerate(args)
+                    if type(arg) not in (Number, Identifier)]
+        spilled = []
+        for n in range(len(computed) - 1, -1, -1):
+            i = computed[n]
+            arg = args[i]
+            self._expr_dispatch[type(arg)](arg)
+            reg = PARAM_REGISTERS[i]
+            remaining = [args[j] for j in computed[:n]]
+            # Keep the value in its register only if nothing evaluated
+            # after it can clobber that register: calls clobber all of
+            # them, division clobbers rdx and nested operations rcx
+            if not any(map(self._contains_call, remaining)) and \
+               (not remaining or reg not in VOLATILE_PARAM_REGISTERS):
+                self.emit(f"    mov {reg}, rax")
+            else:
+                self.emit("    push rax")
+                spilled.append(reg)
         
+        for reg in reversed(spilled):
+            self.emit("    pop " + reg)
+        
+        for arg, reg in zip(args, PARAM_REGISTERS):
+            if type(arg) is Number:
+                self.emit(f"    mov {reg}, {arg.value}")
+            elif type(arg) is Identifier:
+                self.emit(f"    mov {reg}, " + self.get_var_location(arg.name))
+        
+        # Call function
+        self.emit("    call " + call.name)
+    
+    def _generate_stacked_call(self, call):
+        """Generate a call with more arguments than argument registers"""
         # Evaluate arguments in reverse order and push to stack
         for arg in reversed(call.args):
-            self.generate_expression(arg)
+            self._expr_dispatch[type(arg)](arg)
             self.emit("    push rax")
         
         # Pop arguments into registers
-        for i in range(len(call.args)):
-            if i < len(param_registers):
-                self.emit(f"    pop {param_registers[i]}")
+        for reg in PARAM_REGISTERS:
+            self.emit("    pop " + reg)
         
         # Call function
-        self.emit(f"    call {call.name}")
+        self.emit("    call " + call.name)
     
     def generate_print_int(self):
         """Generate code to print integer in rax"""
         # Convert integer to string and print
         # For simplicity, we'll use a simple digit-by-digit conversion
-        
-        self.emit("    # Print integer in rax")
-        self.emit("    mov rdi, rax")
-        self.emit("    call print_number")
+        self.emit_block(PRINT_INT)
     
     def add_print_helper(self):
         """Add helper function to print numbers"""
-        helper = """
-print_number:
-    push rbp
-    mov rbp, rsp
-    sub rsp, 32
-    
-    mov rax, rdi
-    mov rcx, 10
-    lea rsi, [rbp-32]
-    mov BYTE PTR [rsi], 10
-    inc rsi
-    
-    test rax, rax
-    jns .convert_digits
-    neg rax
-    push rax
-    mov rax, 45
-    mov BYTE PTR [rsi], al
-    inc rsi
-    pop rax
-    
-.convert_digits:
-    test rax, rax
-    jnz .digit_loop
-    mov BYTE PTR [rsi], 48
-    inc rsi
-    jmp .print_loop
-    
-.digit_loop:
-    test rax, rax
-    jz .print_loop
-    xor rdx, rdx
-    div rcx
-    add dl, 48
-    mov BYTE PTR [rsi], dl
-    inc rsi
-    jmp .digit_loop
-    
-.print_loop:
-    dec rsi
-    cmp BYTE PTR [rsi], 10
-    je .end_print
-    
-    mov rax, 1
-    mov rdi, 1
-    mov rdx, 1
-    syscall
-    jmp .print_loop
-    
-.end_print:
-    mov rsp, rbp
-    pop rbp
-    ret
-"""
-        return helper
+        return PRINT_HELPER
@@ -10,8 +10,9 @@ from lexer import Lexer
 from parser import Parser
 from semantic import SemanticAnalyzer
 from codegen import CodeGenerator
+from ast_nodes import pretty
 
-def compile_file(input_file, output_file):
+def compile_file(input_file, output_file, show_tokens=False, show_ast=False, debug=False):
     """Compile a single Arabic source file to assembly"""
     try:
         # Read source code
@@ -22,11 +23,16 @@ def compile_file(input_file, output_file):
         print(f"[1/4] Lexical analysis...")
         lexer = Lexer(source)
         tokens = lexer.tokenize()
+        if show_tokens:
+            for token in tokens:
+                print(f"  {token}")
         
         # Parsing
         print(f"[2/4] Parsing...")
         parser = Parser(tokens)
         ast = parser.parse()
+        if show_ast:
+            print(pretty(ast))
         
         # Semantic analysis
         print(f"[3/4] Semantic analysis...")
@@ -59,8 +65,9 @@ def compile_file(input_file, output_file):
         return False
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc()
+        if debug:
+            import traceback
+            traceback.print_exc()
         return False
 
 def main():
@@ -69,6 +76,7 @@ def main():
     parser.add_argument('-o', '--output', help='Output assembly file (.s)', default=None)
     parser.add_argument('--tokens', action='store_true', help='Print tokens')
     parser.add_argument('--ast', action='store_true', help='Print AST')
+    parser.add_argument('--debug', action='store_true', help='Print tracebacks for internal errors')
     
     args = parser.parse_args()
     
@@ -79,7 +87,7 @@ def main():
         output_file = args.input.rsplit('.', 1)[0] + '.s'
     
     # Compile
-    success = compile_file(args.input, output_file)
+    success = compile_file(args.input, output_file, args.tokens, args.ast, args.debug)
     
     sys.exit(0 if success else 1)
 
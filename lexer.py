@@ -4,9 +4,12 @@ Tokenizes Arabic source code into meaningful tokens
 """
 
 import re
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 
-class TokenType(Enum):
+from ast_nodes import (OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_EQ, OP_NE,
+                       OP_GT, OP_LT, OP_GE, OP_LE)
+
+class TokenType(IntEnum):
     # Keywords
     VAR = auto()        # متغير
     IF = auto()         # اذا
@@ -45,8 +48,17 @@ class TokenType(Enum):
     # Special
     EOF = auto()
     NEWLINE = auto()
+    
+    # Keep "TokenType.NAME" in error messages rather than the bare int;
+    # before Python 3.11, Enum.__format__ on an IntEnum formats the value
+    __str__ = Enum.__str__
+    
+    def __format__(self, spec):
+        return format(str(self), spec)
 
 class Token:
+    __slots__ = ('type', 'value', 'line', 'column')
+    
     def __init__(self, type, value, line, column):
         self.type = type
         self.value = value
@@ -56,6 +68,51 @@ class Token:
     def __repr__(self):
         return f"Token({self.type}, {self.value!r}, {self.line}:{self.column})"
 
+# Arabic characters allowed in identifiers: the Arabic and Arabic
+# Supplement blocks, minus Arabic comma, semicolon and question mark
+ARABIC_IDENT_CHARS = frozenset(
+    chr(code) for code in range(0x0600, 0x0700) if code not in (0x060C, 0x061B, 0x061F)
+) | frozenset(chr(code) for code in range(0x0750, 0x0780))
+
+def _char_class(chars):
+    """Collapse a set of characters into regex character-class ranges"""
+    codes = sorted(map(ord, chars))
+    ranges = []
+    start = prev = codes[0]
+    for code in codes[1:]:
+        if code != prev + 1:
+            ranges.append((start, prev))
+            start = code
+        prev = code
+    ranges.append((start, prev))
+    return ''.join(f'\\u{lo:04X}' if lo == hi else f'\\u{lo:04X}-\\u{hi:04X}'
+                   for lo, hi in ranges)
+
+# Identifier characters besides letters, digits and '_'
+_ARABIC_CLASS = _char_class(ARABIC_IDENT_CHARS)
+
+# One match per token: a leading run of whitespace and comments is
+# skipped, then the group that matched names the token kind. Every
+# alternative can match at any position (MISMATCH takes any character),
+# so the skipped run is never backtracked into.
+# Order matters: numbers before identifiers (Arabic-Indic digits are in the
+# Arabic block) and two-char operators before one-char. END matches once
+# only trailing whitespace and comments remain.
+#
+# NUMBER takes decimal digits only (what int() accepts); any other numeric
+# character, such as '²' or 'Ⅳ', lexes as an identifier letter. The old
+# isdigit()/isalpha() scanner made '²' a NUMBER that int() then rejected,
+# and rejected 'Ⅳ' as an unexpected character.
+TOKEN_RE = re.compile(
+    r'(?:[ \t\r\n]|//[^\n]*)*'
+    r'(?:(?P<NUMBER>\d+)'
+    r'|(?P<IDENT>(?:[^\W\d]|[' + _ARABIC_CLASS + r'])[\w' + _ARABIC_CLASS + r']*)'
+    r'|(?P<OP>==|!=|>=|<=|[-+*/=><(){};,\u061B\u060C])'
+    r'|(?P<END>\Z)'
+    r'|(?P<MISMATCH>.))',
+    re.DOTALL,
+)
+
 class Lexer:
     # Arabic keywords mapping
     KEYWORDS = {
@@ -69,167 +126,88 @@ class Lexer:
         'اطبع': TokenType.PRINT,
     }
     
+    # Operators and delimiters: source text -> (token type, token value)
+    OPERATORS = {
+        '+': (TokenType.PLUS, OP_ADD),
+        '-': (TokenType.MINUS, OP_SUB),
+        '*': (TokenType.MULTIPLY, OP_MUL),
+        '/': (TokenType.DIVIDE, OP_DIV),
+        '=': (TokenType.ASSIGN, '='),
+        '==': (TokenType.EQ, OP_EQ),
+        '!=': (TokenType.NE, OP_NE),
+        '>': (TokenType.GT, OP_GT),
+        '<': (TokenType.LT, OP_LT),
+        '>=': (TokenType.GE, OP_GE),
+        '<=': (TokenType.LE, OP_LE),
+        '(': (TokenType.LPAREN, '('),
+        ')': (TokenType.RPAREN, ')'),
+        '{': (TokenType.LBRACE, '{'),
+        '}': (TokenType.RBRACE, '}'),
+        ';': (TokenType.SEMICOLON, ';'),
+        '؛': (TokenType.SEMICOLON, ';'),  # Arabic semicolon
+        ',': (TokenType.COMMA, ','),
+        '،': (TokenType.COMMA, ','),  # Arabic comma
+    }
+    
     def __init__(self, source):
         self.source = source
         self.pos = 0
         self.line = 1
         self.column = 1
+        # Grown with list.append on purpose: a preallocated list filled
+        # through an index cursor costs more bytecode per token in CPython
         self.tokens = []
     
     def error(self, msg):
         raise SyntaxError(f"Lexer error at {self.line}:{self.column}: {msg}")
     
-    def current_char(self):
-        if self.pos >= len(self.source):
-            return None
-        return self.source[self.pos]
-    
-    def peek_char(self, offset=1):
-        pos = self.pos + offset
-        if pos >= len(self.source):
-            return None
-        return self.source[pos]
-    
-    def advance(self):
-        if self.pos < len(self.source):
-            if self.source[self.pos] == '\n':
-                self.line += 1
-                self.column = 1
-            else:
-                self.column += 1
-            self.pos += 1
-    
-    def skip_whitespace(self):
-        while self.current_char() and self.current_char() in ' \t\r\n':
-            self.advance()
-    
-    def skip_comment(self):
-        # Skip single-line comments starting with //
-        if self.current_char() == '/' and self.peek_char() == '/':
-            while self.current_char() and self.current_char() != '\n':
-                self.advance()
-    
-    def read_number(self):
-        start_col = self.column
-        num = ''
-        while self.current_char() and self.current_char().isdigit():
-            num += self.current_char()
-            self.advance()
-        return Token(TokenType.NUMBER, num, self.line, start_col)
-    
-    def read_identifier(self):
-        start_col = self.column
-        ident = ''
-        
-        # Arabic characters and underscores
-        while self.current_char() and (self.current_char().isalnum() or 
-                                       self.current_char() == '_' or
-                                       self.is_arabic_char(self.current_char())):
-            ident += self.current_char()
-            self.advance()
-        
-        # Check if it's a keyword
-        token_type = self.KEYWORDS.get(ident, TokenType.IDENTIFIER)
-        return Token(token_type, ident, self.line, start_col)
-    
-    def is_arabic_char(self, char):
-        """Check if character is in Arabic Unicode range (excluding punctuation)"""
-        if not char:
-            return False
-        code = ord(char)
-        # Exclude Arabic punctuation marks like ؛ (U+061B) and ، (U+060C)
-        if code in [0x060C, 0x061B, 0x061F]:  # Arabic comma, semicolon, question mark
-            return False
-        return (0x0600 <= code <= 0x06FF) or (0x0750 <= code <= 0x077F)
-    
     def tokenize(self):
-        while self.pos < len(self.source):
-            self.skip_whitespace()
-            
-            if self.pos >= len(self.source):
-                break
-            
-            # Skip comments
-            if self.current_char() == '/' and self.peek_char() == '/':
-                self.skip_comment()
-                continue
-            
-            char = self.current_char()
-            col = self.column
-            
-            # Numbers
-            if char.isdigit():
-                self.tokens.append(self.read_number())
+        # Loop state lives in locals; self.pos/line/column are only written
+        # back when reporting an error and at the end
+        source = self.source
+        count_newlines = source.count
+        find_last_newline = source.rfind
+        line = self.line
+        line_start = 0  # Offset of the first character of the current line
+        append = self.tokens.append
+        keywords = self.KEYWORDS
+        operators = self.OPERATORS
+        identifier = TokenType.IDENTIFIER
+        number = TokenType.NUMBER
+        
+        for match in TOKEN_RE.finditer(source):
+            kind = match.lastgroup
+            start = match.start()
+            pos = match.start(kind)
             
-            # Identifiers and keywords (including Arabic)
-            elif char.isalpha() or char == '_' or self.is_arabic_char(char):
-                self.tokens.append(self.read_identifier())
+            if pos != start:
+                # Skipped whitespace/comments; count lines without slicing
+                newlines = count_newlines('\n', start, pos)
+                if newlines:
+                    line += newlines
+                    line_start = find_last_newline('\n', start, pos) + 1
             
-            # Operators and delimiters
-            elif char == '+':
-                self.tokens.append(Token(TokenType.PLUS, '+', self.line, col))
-                self.advance()
-            elif char == '-':
-                self.tokens.append(Token(TokenType.MINUS, '-', self.line, col))
-                self.advance()
-            elif char == '*':
-                self.tokens.append(Token(TokenType.MULTIPLY, '*', self.line, col))
-                self.advance()
-            elif char == '/':
-                self.tokens.append(Token(TokenType.DIVIDE, '/', self.line, col))
-                self.advance()
-            elif char == '=':
-                if self.peek_char() == '=':
-                    self.tokens.append(Token(TokenType.EQ, '==', self.line, col))
-                    self.advance()
-                    self.advance()
-                else:
-                    self.tokens.append(Token(TokenType.ASSIGN, '=', self.line, col))
-                    self.advance()
-            elif char == '!':
-                if self.peek_char() == '=':
-                    self.tokens.append(Token(TokenType.NE, '!=', self.line, col))
-                    self.advance()
-                    self.advance()
-                else:
-                    self.error(f"Unexpected character '!'")
-            elif char == '>':
-                if self.peek_char() == '=':
-                    self.tokens.append(Token(TokenType.GE, '>=', self.line, col))
-                    self.advance()
-                    self.advance()
-                else:
-                    self.tokens.append(Token(TokenType.GT, '>', self.line, col))
-                    self.advance()
-            elif char == '<':
-                if self.peek_char() == '=':
-                    self.tokens.append(Token(TokenType.LE, '<=', self.line, col))
-                    self.advance()
-                    self.advance()
-                else:
-                    self.tokens.append(Token(TokenType.LT, '<', self.line, col))
-                    self.advance()
-            elif char == '(':
-                self.tokens.append(Token(TokenType.LPAREN, '(', self.line, col))
-                self.advance()
-            elif char == ')':
-                self.tokens.append(Token(TokenType.RPAREN, ')', self.line, col))
-                self.advance()
-            elif char == '{':
-                self.tokens.append(Token(TokenType.LBRACE, '{', self.line, col))
-                self.advance()
-            elif char == '}':
-                self.tokens.append(Token(TokenType.RBRACE, '}', self.line, col))
-                self.advance()
-            elif char == ';' or char == '؛':  # Support both ASCII and Arabic semicolon
-                self.tokens.append(Token(TokenType.SEMICOLON, ';', self.line, col))
-                self.advance()
-            elif char == ',' or char == '،':  # Support both ASCII and Arabic comma
-                self.tokens.append(Token(TokenType.COMMA, ',', self.line, col))
-                self.advance()
+            if kind == 'IDENT':
+                text = match.group(kind)
+                # Check if it's a keyword
+                append(Token(keywords.get(text, identifier), text, line, pos - line_start + 1))
+            elif kind == 'OP':
+                token_type, value = operators[match.group(kind)]
+                append(Token(token_type, value, line, pos - line_start + 1))
+            elif kind == 'NUMBER':
+                append(Token(number, match.group(kind), line, pos - line_start + 1))
+            elif kind == 'END':
+                break
             else:
-                self.error(f"Unexpected character '{char}'")
+                self.pos = pos
+                self.line = line
+                self.column = pos - line_start + 1
+                self.error(f"Unexpected character '{match.group(kind)}'")
+        
+        self.pos = len(source)
+        self.line = line
+        self.column = self.pos - line_start + 1
         
         # Add EOF token
-        self.tokens.append(Token(TokenType.EOF, None, self.line, self.column))
+        append(Token(TokenType.EOF, None, self.line, self.column))
         return self.tokens
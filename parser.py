@@ -6,10 +6,25 @@ Builds an Abstract Syntax Tree from tokens
 from lexer import TokenType, Token
 from ast_nodes import *
 
+# Operator token types for each precedence level
+COMPARISON_TOKENS = frozenset((TokenType.EQ, TokenType.NE, TokenType.GT,
+                               TokenType.LT, TokenType.GE, TokenType.LE))
+ADDITIVE_TOKENS = frozenset((TokenType.PLUS, TokenType.MINUS))
+MULTIPLICATIVE_TOKENS = frozenset((TokenType.MULTIPLY, TokenType.DIVIDE))
+
 class Parser:
     def __init__(self, tokens):
         self.tokens = tokens
         self.pos = 0
+        
+        # Statement parsers keyed by their leading keyword token
+        self._stmt_dispatch = {
+            TokenType.VAR: self.parse_var_decl,
+            TokenType.IF: self.parse_if_statement,
+            TokenType.WHILE: self.parse_while_statement,
+            TokenType.RETURN: self.parse_return_statement,
+            TokenType.PRINT: self.parse_print_statement,
+        }
     
     def error(self, msg):
         token = self.current_token()
@@ -83,16 +98,9 @@ class Parser:
         """Parse a statement"""
         token = self.current_token()
         
-        if token.type == TokenType.VAR:
-            return self.parse_var_decl()
-        elif token.type == TokenType.IF:
-            return self.parse_if_statement()
-        elif token.type == TokenType.WHILE:
-            return self.parse_while_statement()
-        elif token.type == TokenType.RETURN:
-            return self.parse_return_statement()
-        elif token.type == TokenType.PRINT:
-            return self.parse_print_statement()
+        handler = self._stmt_dispatch.get(token.type)
+        if handler:
+            return handler()
         elif token.type == TokenType.IDENTIFIER:
             # Could be assignment or function call
             if self.peek_token().type == TokenType.ASSIGN:
@@ -172,9 +180,7 @@ class Parser:
         """Parse comparison operators: ==, !=, >, <, >=, <="""
         left = self.parse_additive()
         
-        while self.current_token().type in [TokenType.EQ, TokenType.NE, 
-                                            TokenType.GT, TokenType.LT,
-                                            TokenType.GE, TokenType.LE]:
+        while self.current_token().type in COMPARISON_TOKENS:
             op = self.current_token().value
             self.advance()
             right = self.parse_additive()
@@ -186,7 +192,7 @@ class Parser:
         """Parse addition and subtraction"""
         left = self.parse_multiplicative()
         
-        while self.current_token().type in [TokenType.PLUS, TokenType.MINUS]:
+        while self.current_token().type in ADDITIVE_TOKENS:
             op = self.current_token().value
             self.advance()
             right = self.parse_multiplicative()
@@ -198,7 +204,7 @@ class Parser:
         """Parse multiplication and division"""
         left = self.parse_unary()
         
-        while self.current_token().type in [TokenType.MULTIPLY, TokenType.DIVIDE]:
+        while self.current_token().type in MULTIPLICATIVE_TOKENS:
             op = self.current_token().value
             self.advance()
             right = self.parse_unary()